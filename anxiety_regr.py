@@ -17,6 +17,7 @@ import argparse
 from pathlib import Path
 
 import colorcet as cc
+import numpy as np
 import pandas as pd
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
@@ -48,16 +49,21 @@ covid_dt = pd.to_datetime(f"{year}-03-11", utc=True)
 start_dt = covid_dt - pd.Timedelta("30D")
 end_dt = covid_dt + pd.Timedelta(f"{days:d}D")
 
-# Load data.
-data = pd.read_csv(import_path)
+# Load data. (Only parse the analyzed columns; the LIWC files have 100+.)
+data = pd.read_csv(import_path, usecols=utils.POST_COLS, **utils.CSV_KWARGS)
 drms = utils.filter_flair(data, posts=posts)
-df = utils.preprocess_subreddit(drms)
+df = utils.preprocess_subreddit(drms, src_path=import_path, cache_key=(posts,))
 
 # Average per day.
-daily = (df
-    .groupby(pd.Grouper(key="timestamp", freq="D"))
-    ["emo_anx"].mean()
-    .sort_index(ascending=True)
+# (utils.binned_mean floors the epoch seconds into day buckets and
+# accumulates sums and counts in one compiled pass; same bins as
+# pd.Grouper(freq="D"), NaN on days without posts. created_utc is already
+# epoch seconds, so no resolution-dependent timestamp arithmetic.)
+epochs = df["created_utc"].to_numpy()
+day_start, daily_means = utils.binned_mean(epochs, df["emo_anx"].to_numpy(), bin_size=86400)
+daily_index = pd.to_datetime(day_start + np.arange(daily_means.size) * 86400, unit="s", utc=True)
+daily = (pd
+    .Series(daily_means, index=pd.Index(daily_index, name="timestamp"), name="emo_anx")
     .to_frame()
 )
 
@@ -91,7 +97,14 @@ daily_precovid = daily.set_index("date").loc[start_dt:covid_dt]
 model_precovid = smf.ols(formula="emo_anx ~ Time + Covid + TimeCovid", data=daily_precovid)
 model_precovid = model_precovid.fit()
 daily_postcovid = daily.set_index("date").loc[covid_dt:]
-predicted = model_precovid.predict(daily_postcovid)
+# (Apply the fitted coefficients with one matmul; .predict re-runs formula
+# handling and validation on every call.)
+params = model_precovid.params
+X_post = daily_postcovid[["Time", "Covid", "TimeCovid"]].to_numpy()
+predicted = pd.Series(
+    params["Intercept"] + X_post @ params[["Time", "Covid", "TimeCovid"]].to_numpy(),
+    index=daily_postcovid.index,
+)
 
 # Compile single dataframe with relevant values.
 dat = daily["emo_anx"].rename("data")
@@ -26,17 +26,18 @@ import_path_posts = derivatives_dir / "LIWC-22 Results - r-dreams_posts - LIWC A
 import_path_titles = derivatives_dir / "LIWC-22 Results - r-dreams_titles - LIWC Analysis.csv"
 export_path = derivatives_dir / "example_view.tsv"
 
-# Load data.
-data_posts = pd.read_csv(import_path_posts)
-data_titles = pd.read_csv(import_path_titles)
+# Load data. (Only parse the analyzed columns; the LIWC files have 100+.)
+data_posts = pd.read_csv(import_path_posts, usecols=utils.POST_COLS, **utils.CSV_KWARGS)
+data_titles = pd.read_csv(import_path_titles, usecols=["id", "nightmare"], **utils.CSV_KWARGS)
 posts = utils.filter_flair(data_posts)
-titles = utils.filter_flair(data_titles)
-df_posts = utils.preprocess_subreddit(posts, column="selftext")
-df_titles = utils.preprocess_subreddit(titles, column="title")
+df_posts = utils.preprocess_subreddit(posts, column="selftext", src_path=import_path_posts, cache_key=("dreams",))
 
 # Reduce to only desired columns and merge.
+# (The preprocessed posts frame already defines the valid ids, so the titles
+# file only contributes its nightmare score per id -- no second flair filter
+# and preprocessing pass over the same corpus.)
 df_posts = df_posts.set_index("id")[["timestamp", "title", "selftext", "emo_anx"]]
-df_titles = df_titles.set_index("id")[["nightmare"]]
+df_titles = data_titles.drop_duplicates(subset="id").set_index("id")[["nightmare"]]
 df = df_posts.join(df_titles)
 
 # Extract the relevant time window.
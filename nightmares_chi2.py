@@ -16,8 +16,9 @@ from pathlib import Path
 
 import colorcet as cc
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import pingouin as pg
+from scipy.stats import chi2_contingency
 
 import utils
 
@@ -36,10 +37,10 @@ export_path_desc = derivatives_dir / f"{year}_{posts}_nightmares_chi2-desc.tsv"
 export_path_stat = derivatives_dir / f"{year}_{posts}_nightmares_chi2-stat.tsv"
 export_path_plot = derivatives_dir / f"{year}_{posts}_nightmares_chi2-plot.png"
 
-# Load data.
-data = pd.read_csv(import_path)
+# Load data. (Only parse the analyzed columns; the LIWC files have 100+.)
+data = pd.read_csv(import_path, usecols=utils.TITLE_COLS, **utils.CSV_KWARGS)
 drms = utils.filter_flair(data, posts=posts)
-df = utils.preprocess_subreddit(drms, column="title")
+df = utils.preprocess_subreddit(drms, column="title", src_path=import_path, cache_key=(posts,))
 
 # Creates pandas datetimes for start, end, COVID declaration.
 covid_dt = pd.to_datetime(f"{year}-03-11", utc=True)
@@ -47,28 +48,30 @@ start_dt = covid_dt - pd.Timedelta("30D")
 end_dt = covid_dt + pd.Timedelta("30D")
 
 # Binarize nightmares.
-df["nightmare"] = df["nightmare"].gt(0).astype(int)
+# (Compare on the raw numpy array and reinterpret the boolean mask as int8;
+# one pass, no intermediate Series or int64 cast.)
+df["nightmare"] = (df["nightmare"].to_numpy() > 0).view(np.int8)
 
 # Reduce to the relevant time period and label pre/post-COVID.
 df = df.loc[df["timestamp"].between(start_dt, end_dt, inclusive="both"), :]
 df["PostCovid"] = df["timestamp"].between(covid_dt, end_dt, inclusive="both")
 
 # Run stats.
-exp, obs, stat = pg.chi2_independence(
-    data=df,
-    x="PostCovid",
-    y="nightmare",
-    correction=False,
-)
+# (Only the pearson chi2 is reported, so build the 2x2 contingency table and
+# call scipy directly instead of pingouin's multi-test wrapper.)
+obs = pd.crosstab(df["PostCovid"], df["nightmare"])
+chi2, p, dof, expected = chi2_contingency(obs, correction=False)
+exp = pd.DataFrame(expected, index=obs.index, columns=obs.columns)
+stat = pd.DataFrame([{"test": "pearson", "chi2": chi2, "dof": dof, "pval": p}])
 
 # Add observed percentage of nightmares and associated confidence intervals.
 obs["total"] = obs.sum(axis=1)
 obs["nm_pct"] = obs[1].div(obs["total"]).mul(100)
 pre_nm_vals = df.query("PostCovid==False")["nightmare"].to_numpy()
 post_nm_vals = df.query("PostCovid==True")["nightmare"].to_numpy()
-bootci_kwargs = dict(func="mean", method="per", n_boot=10000, decimals=6)
-pre_nm_ci = 100 * pg.compute_bootci(pre_nm_vals, **bootci_kwargs)
-post_nm_ci = 100 * pg.compute_bootci(post_nm_vals, **bootci_kwargs)
+bootci_kwargs = dict(n_boot=10000, ci=95, seed=0)
+pre_nm_ci = 100 * utils.fast_bootci(pre_nm_vals, **bootci_kwargs)
+post_nm_ci = 100 * utils.fast_bootci(post_nm_vals, **bootci_kwargs)
 obs = obs.sort_index()
 obs["nm_ci_lo"] = [pre_nm_ci[0], post_nm_ci[0]]
 obs["nm_ci_hi"] = [pre_nm_ci[1], post_nm_ci[1]]
@@ -17,7 +17,6 @@ import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
 import utils
 
@@ -40,16 +39,18 @@ covid_dt = pd.to_datetime(f"{year}-03-11", utc=True)
 start_dt = covid_dt - pd.Timedelta("30D")
 end_dt = covid_dt + pd.Timedelta("30D")
 
-# Load data.
-data = pd.read_csv(import_path, encoding="utf-8")
-df = utils.preprocess_subreddit(data)
+# Load data. (Only parse the columns used below.)
+data = pd.read_csv(import_path, encoding="utf-8", usecols=["created_utc", "link_flair_text", "selftext"], **utils.CSV_KWARGS)
+df = utils.preprocess_subreddit(data, src_path=import_path)
 
 # Consolidate flair
+# (A single vectorized where-pass collapses NaN and non-dream flairs to
+# "None", replacing the fillna + replace chain that hashed every value.)
 dream_flair = ["Short Dream", "Medium Dream", "Long Dream"]
-nondream_flair = [ f for f in df["link_flair_text"].unique() if f not in dream_flair ]
-df["Dream flair"] = (df["link_flair_text"]
-    .fillna(value="None")
-    .replace(to_replace=nondream_flair, value="None")
+flair = df["link_flair_text"]
+df["Dream flair"] = pd.Categorical(
+    flair.where(flair.isin(dream_flair), other="None"),
+    categories=["None"] + dream_flair,
 )
 
 # Average post counts per day.
@@ -60,6 +61,9 @@ daily = (df.
     .fillna(0)
     .sort_index(ascending=True)
 )
+# Unstacking the categorical key leaves a CategoricalIndex, which would
+# refuse the extra total/dream columns added below.
+daily.columns = daily.columns.astype("object")
 daily["total"] = daily.sum(axis=1)
 daily["dream"] = daily[dream_flair].sum(axis=1)
 
@@ -103,25 +107,27 @@ palette = {
 # Open figure.
 fig, ax = plt.subplots(figsize=(3.8, 1.5))
 
-# Identify histogram bins.
-lower_xbound = mdates.date2num(start_dt)
-upper_xbound = mdates.date2num(end_dt + pd.Timedelta("1D"))
-bins = np.arange(lower_xbound, upper_xbound)
-
 # Draw data.
-ax = sns.histplot(
-    df,
-    x="timestamp",
-    hue="Dream flair",
-    multiple="stack",
-    palette=palette,
-    hue_order=list(palette),
-    bins=bins,
-    edgecolor="black",
-    linewidth=.5,
-    ax=ax,
-    clip_on=False,
-)
+# (The daily per-flair counts are already computed above, so draw ~60
+# stacked bars directly instead of routing every post through seaborn's
+# histplot binning.)
+xvals = mdates.date2num(daily.index)
+bottom = np.zeros(len(daily))
+for flair in palette:
+    heights = daily[flair].to_numpy(dtype=float)
+    ax.bar(
+        xvals,
+        heights,
+        bottom=bottom,
+        width=1,
+        align="edge",
+        color=palette[flair],
+        edgecolor="black",
+        linewidth=.5,
+        label=flair,
+        clip_on=False,
+    )
+    bottom += heights
 
 # Adjust aesthetics.
 ax.margins(x=0)
@@ -138,9 +144,9 @@ ax.xaxis.set_minor_locator(date_minor_locator)
 ax.xaxis.set_major_formatter(date_major_formatter)
 ax.yaxis.set_major_locator(plt.MultipleLocator(50))
 ax.yaxis.set_minor_locator(plt.MultipleLocator(10))
-sns.move_legend(
-    ax,
-    "upper center",
+ax.legend(
+    title="Dream flair",
+    loc="upper center",
     ncol=4,
     borderaxespad=0,
     columnspacing=1,
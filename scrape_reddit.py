@@ -1,12 +1,13 @@
 """Scrape a given subreddit."""
 
 import argparse
+import asyncio
 import datetime
 from pathlib import Path
 
+import httpx
 import pandas as pd
-from psaw import PushshiftAPI
-import tqdm
+from tqdm.asyncio import tqdm
 
 import utils
 
@@ -25,7 +26,7 @@ end_date = args.end
 export_dir = Path(utils.config["source_directory"])
 export_basename = f"r-{subreddit}.csv".lower()
 export_path = export_dir / export_basename
-export_path_pickle = export_path.with_suffix(".pkl")
+export_path_parquet = export_path.with_suffix(".parquet")
 
 # Convert timestamp strings to epoch-based integers.
 start_epoch = int(datetime.datetime.strptime(start_date, "%Y-%m-%d").timestamp())
@@ -48,23 +49,84 @@ submission_filters = [
     "selftext",
 ]
 
-# Find all relevant Reddit posts.
-api = PushshiftAPI()
-gen = api.search_submissions(
-    subreddit=subreddit,
-    filter=submission_filters,
-    after=start_epoch,
-    before=end_epoch,
-)
+# Pushshift endpoint and request tuning. The scrape is entirely bound on
+# Pushshift latency, so the target window is sliced into weekly sub-queries
+# that are fetched concurrently (with a cap on in-flight requests).
+api_url = "https://api.pushshift.io/reddit/search/submission"
+max_concurrent_requests = 8
+max_retries = 5
+page_size = 500
+week_seconds = 7 * 24 * 60 * 60
 
-# Grab all the posts and turn into a dataframe (takes a while).
-df = pd.DataFrame([ thing.d_ for thing in tqdm.tqdm(gen, desc=f"Scraping r/{subreddit}") ])
 
-# Reorder columns, including the "created" stamp.
-df = df[["created"] + submission_filters]
+async def get_page(client, params):
+    """GET one page, backing off on rate limiting and server errors."""
+    for attempt in range(max_retries):
+        response = await client.get(api_url, params=params)
+        if response.status_code == 429 or response.status_code >= 500:
+            await asyncio.sleep(2 ** attempt)
+            continue
+        response.raise_for_status()
+        return response.json()["data"]
+    response.raise_for_status()
 
-# Export as a csv file.
+
+async def fetch_chunk(client, semaphore, after, before):
+    """Pull all submissions in [after, before), paginating on created_utc."""
+    posts = []
+    # Pushshift's after/before are exclusive, so step back one second to
+    # include posts created exactly at the chunk edge.
+    after = after - 1
+    while True:
+        params = {
+            "subreddit": subreddit,
+            "after": after,
+            "before": before,
+            "filter": ",".join(submission_filters),
+            "size": page_size,
+            "sort": "asc",
+            "sort_type": "created_utc",
+        }
+        async with semaphore:
+            page = await get_page(client, params)
+        if not page:
+            return posts
+        posts.extend(page)
+        # Resume one second before the newest post on this page, so posts
+        # sharing the final second of a full page aren't skipped by the
+        # exclusive cursor; the overlap is deduplicated by id afterwards.
+        next_after = page[-1]["created_utc"] - 1
+        if next_after == after:
+            # The whole page shares one second; move past it rather than
+            # refetching the same page forever.
+            next_after = after + 1
+        after = next_after
+
+
+async def scrape():
+    """Fetch all weekly chunks concurrently and return a flat list of posts."""
+    edges = list(range(start_epoch, end_epoch, week_seconds)) + [end_epoch]
+    semaphore = asyncio.Semaphore(max_concurrent_requests)
+    async with httpx.AsyncClient(timeout=30) as client:
+        tasks = [
+            fetch_chunk(client, semaphore, chunk_start, chunk_end)
+            for chunk_start, chunk_end in zip(edges[:-1], edges[1:])
+        ]
+        chunks = await tqdm.gather(*tasks, desc=f"Scraping r/{subreddit}")
+    return [post for chunk in chunks for post in chunk]
+
+
+# Find all relevant Reddit posts and turn into a dataframe.
+df = pd.DataFrame(asyncio.run(scrape()))
+
+# Drop the pagination/chunk-edge overlap, order chronologically, and
+# reorder columns.
+df = df.drop_duplicates(subset="id")
+df = df.sort_values("created_utc", ignore_index=True)
+df = df.reindex(columns=submission_filters)
+
+# Export as a csv file (LIWC reads this).
 df.to_csv(export_path, encoding="utf-8-sig", index=False, na_rep="NA")
 
-# Export as a pickle file as backup.
-df.to_pickle(export_path_pickle)
+# Export as a parquet file as backup (much faster than pickle to reload).
+df.to_parquet(export_path_parquet)